@@ -1,6 +1,7 @@
 import argparse
+import asyncio
+import os
 import shlex
-import subprocess
 from safepo.utils.config import multi_agent_velocity_map
 
 
@@ -46,57 +47,71 @@ def parse_args():
     return args
 
 
-def run_experiment(command: str):
+async def run_experiment(command: str, seed: int, semaphore: asyncio.Semaphore):
     command_list = shlex.split(command)
-    print(f"running {command}")
-    fd = subprocess.Popen(command_list)
-    return_code = fd.wait()
-    assert return_code == 0
+    async with semaphore:
+        print(f"running {command}")
+        # PYTHONHASHSEED only takes effect at interpreter start, so it has
+        # to be exported to the child; setting it inside set_seed is too
+        # late.
+        env = dict(os.environ, PYTHONHASHSEED=str(seed))
+        process = await asyncio.create_subprocess_exec(*command_list, env=env)
+        return_code = await process.wait()
+        assert return_code == 0
+
+
+async def run_all_experiments(commands, workers):
+    semaphore = asyncio.Semaphore(workers)
+    await asyncio.gather(
+        *(run_experiment(command, seed, semaphore) for seed, command in commands)
+    )
 
 
 if __name__ == "__main__":
     args = parse_args()
 
+    # catch a typo'd algo once here instead of letting every (task, seed)
+    # job pay python startup just to fail on the missing script
+    missing = [algo for algo in args.algo if not os.path.isfile(f"{algo}.py")]
+    assert not missing, f"no script found for algorithms: {missing}"
+
     commands = []
 
     for seed in range(0, args.num_seeds):
         for task in args.tasks:
             for algo in args.algo:
+                seed_value = args.start_seed + 1000*seed
                 commands += [
-                    " ".join(
-                        [
-                            f"python {algo}.py",
-                            "--task",
-                            task,
-                            "--seed",
-                            str(args.start_seed + 1000*seed),
-                            "--write-terminal",
-                            "False",
-                            "--experiment",
-                            args.experiment,
-                            "--headless",
-                            "True",
-                            "--total-steps",
-                            str(args.total_steps),
-                            "--num-envs",
-                            str(args.num_envs),
-                        ]
+                    (
+                        seed_value,
+                        " ".join(
+                            [
+                                f"python {algo}.py",
+                                "--task",
+                                task,
+                                "--seed",
+                                str(seed_value),
+                                "--write-terminal",
+                                "False",
+                                "--experiment",
+                                args.experiment,
+                                "--headless",
+                                "True",
+                                "--total-steps",
+                                str(args.total_steps),
+                                "--num-envs",
+                                str(args.num_envs),
+                            ]
+                        ),
                     )
                 ]
 
     print("======= commands to run:")
-    for command in commands:
+    for seed_value, command in commands:
         print(command)
 
     if args.workers > 0:
-        from concurrent.futures import ThreadPoolExecutor
-
-        executor = ThreadPoolExecutor(
-            max_workers=args.workers, thread_name_prefix="safepo-benchmark-worker-"
-        )
-        for command in commands:
-            executor.submit(run_experiment, command)
-        executor.shutdown(wait=True)
+        asyncio.run(run_all_experiments(commands, args.workers))
     else:
         print(
             "not running the experiments because --workers is set to 0; just printing the commands to run"
@@ -1,47 +1,66 @@
 import argparse
+import asyncio
+import os
 import shlex
-import subprocess
+import sys
+from collections import deque, namedtuple
+from itertools import product
 
-navi_robots = ['Ant', 'Car', 'Doggo', 'Point', 'Racecar']
-navi_tasks = ['Button', 'Circle', 'Goal', 'Push']
-diffculies = ['1', '2']
-vel_robots = ['Ant', 'HalfCheetah', 'Hopper', 'Walker2d', 'Swimmer', 'Humanoid']
-vel_tasks = ['Velocity']
+navi_robots = ('Ant', 'Car', 'Doggo', 'Point', 'Racecar')
+navi_tasks = ('Button', 'Circle', 'Goal', 'Push')
+diffculies = ('1', '2')
+vel_robots = ('Ant', 'HalfCheetah', 'Hopper', 'Walker2d', 'Swimmer', 'Humanoid')
 
-navi_envs = [
+NAVI_ENVS = tuple(
     f"Safety{robot}{task}{diffculty}-v0"
-    for diffculty in diffculies
-    for robot in navi_robots
-    for task in navi_tasks
-]
+    for diffculty, robot, task in product(diffculies, navi_robots, navi_tasks)
+)
 
-vel_envs = [
-    f"Safety{robot}{task}-v1"
-    for robot in vel_robots
-    for task in vel_tasks
-]
+VEL_ENVS = tuple(f"Safety{robot}Velocity-v1" for robot in vel_robots)
+
+ALL_ENVS = NAVI_ENVS + VEL_ENVS
+
+ALGOS = (
+    "pcpo",
+    "ppo_lag",
+    "cup",
+    "focops",
+    "rcpo",
+    "trpo_lag",
+    "cpo",
+    "cppo_pid",
+)
+
+# Which envs each algorithm can actually run. Every current single-agent
+# algorithm handles the full mujoco-based env list, so the matrix is
+# permissive today; an algorithm with narrower support (e.g. isaacgym-only)
+# can register a smaller set here so impossible jobs are dropped before
+# they pay interpreter and torch startup just to crash.
+SUPPORTED = {algo: set(ALL_ENVS) for algo in ALGOS}
+
+
+def is_supported(job):
+    """Veto only combinations the matrix positively knows are unsupported.
+
+    Unknown algorithms and custom env ids are let through unchanged.
+    """
+    supported = SUPPORTED.get(job.algo)
+    if supported is None or job.task not in ALL_ENVS:
+        return True
+    return job.task in supported
 
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--tasks",
         nargs="+",
-        default=navi_envs+vel_envs,
+        default=ALL_ENVS,
         help="the ids of the environment to benchmark",
     )
     parser.add_argument(
         "--algo",
         nargs="+",
-        default=[
-            "pcpo",
-            "ppo_lag",
-            "cup",
-            "focops",
-            "rcpo",
-            "trpo_lag",
-            "cpo",
-            "cppo_pid"
-        ],
+        default=ALGOS,
         help="the ids of the algorithm to benchmark",
     )
     parser.add_argument(
@@ -51,7 +70,16 @@ def parse_args():
         "--start-seed", type=int, default=0, help="the number of the starting seed"
     )
     parser.add_argument(
-        "--workers", type=int, default=1, help="the number of workers to run benchmark experimenets",
+        "--workers",
+        type=int,
+        default=len(os.sched_getaffinity(0)),
+        help="the number of workers to run benchmark experimenets; defaults to the number of usable cpus",
+    )
+    parser.add_argument(
+        "--oversubscribe",
+        type=float,
+        default=1.0,
+        help="multiplier applied to --workers; values above 1 help when jobs spend time blocked",
     )
     parser.add_argument(
         "--experiment", type=str, default="benchmark", help="name of the experiment"
@@ -65,23 +93,156 @@ def parse_args():
     parser.add_argument(
         "--steps-per-epoch", type=int, default=20000, help="number of steps per epoch"
     )
+    parser.add_argument(
+        "--log-dir",
+        type=str,
+        default="./benchmark-logs",
+        help="directory to save the captured terminal output of each run",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="subprocess",
+        choices=["subprocess", "pool", "torch-mp"],
+        help="run each job as a fresh subprocess or reuse persistent pooled workers",
+    )
     args = parser.parse_args()
+    args.workers = int(args.workers * args.oversubscribe)
 
     return args
 
 
-def run_experiment(command: str):
-    command_list = shlex.split(command)
-    print(f"running {command}")
-    fd = subprocess.Popen(command_list)
-    return_code = fd.wait()
+Job = namedtuple("Job", ["algo", "task", "seed", "cli_args"])
+
+
+def job_command(job):
+    # sys.executable rather than a bare "python": children run under the
+    # driver's interpreter, and an absolute executable path is one of the
+    # conditions for subprocess's posix_spawn fast path.
+    return [sys.executable, f"{job.algo}.py", *job.cli_args]
+
+
+async def run_experiment(job, log_dir):
+    command = job_command(job)
+    print(f"running {shlex.join(command)}")
+    # PYTHONHASHSEED only takes effect at interpreter start, so it has to
+    # be exported to the child; setting it inside set_seed is too late.
+    env = dict(os.environ, PYTHONHASHSEED=str(job.seed))
+    log_path = os.path.join(log_dir, f"{job.algo}-{job.task}-{job.seed}.log")
+    # Capture child output into a block-buffered file so a run that prints
+    # to the terminal doesn't turn into one write syscall per line.
+    with open(log_path, "wb", buffering=1 << 20) as log_file:
+        # close_fds=False lets CPython spawn the child via posix_spawn()
+        # instead of fork()+exec(), which avoids duplicating the driver's
+        # page tables for every launched job.
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            close_fds=False,
+            env=env,
+            stdout=log_file,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        return_code = await process.wait()
     assert return_code == 0
 
 
+async def run_worker(local_queue, peers, log_dir):
+    while True:
+        if not local_queue:
+            for peer in peers:
+                if peer:
+                    # steal about a quarter of the victim's queue in one
+                    # go rather than one job at a time, so jobs stop
+                    # ping-ponging between workers.
+                    count = max(1, len(peer) // 4)
+                    local_queue.extend(peer.popleft() for _ in range(count))
+                    break
+            else:
+                return
+        job = local_queue.pop()
+        await run_experiment(job, log_dir)
+
+
+async def run_all_experiments(jobs, workers, log_dir):
+    """Dispatch commands through per-worker queues with work stealing.
+
+    Every worker owns a local deque and pops jobs from its own tail; once
+    it runs dry it steals from the head of a peer's queue instead of going
+    idle. This keeps slow algorithms (e.g. cpo) from leaving a trailing
+    worker with a long private backlog while the others sit finished.
+    """
+    queues = [deque() for _ in range(workers)]
+    for index, job in enumerate(jobs):
+        queues[index % workers].append(job)
+    os.makedirs(log_dir, exist_ok=True)
+    await asyncio.gather(
+        *(
+            run_worker(queue, queues[:index] + queues[index + 1:], log_dir)
+            for index, queue in enumerate(queues)
+        )
+    )
+
+
+def run_pooled_experiments(jobs, workers):
+    import multiprocessing
+
+    import worker
+
+    jobs_by_algo = {}
+    for job in jobs:
+        jobs_by_algo.setdefault(job.algo, []).append(job.cli_args)
+    for algo, algo_jobs in jobs_by_algo.items():
+        with multiprocessing.Pool(
+            processes=workers, initializer=worker.load_algo, initargs=(algo,)
+        ) as pool:
+            for _ in pool.imap_unordered(worker.run, algo_jobs):
+                pass
+
+
+def _torch_mp_worker(rank, job_queue):
+    import worker
+
+    while True:
+        item = job_queue.get()
+        if item is None:
+            return
+        algo, cli_args = item
+        # load_algo hits sys.modules after the first import of each algo,
+        # so switching algorithms mid-sweep stays cheap.
+        worker.load_algo(algo)
+        worker.run(cli_args)
+
+
+def run_torch_mp_experiments(jobs, workers):
+    """Dispatch jobs to long-lived torch.multiprocessing workers.
+
+    Each spawned worker owns one CUDA context for the whole sweep and
+    pulls jobs from a shared queue, so a GPU sweep pays interpreter,
+    torch and CUDA initialization once per worker instead of once per
+    (task, seed, algo) job.
+    """
+    import torch.multiprocessing as mp
+
+    # mp.spawn starts its workers from the spawn context, and a queue
+    # allocated from the default (fork) context cannot be shared with
+    # them, so the queue has to come from the matching context.
+    job_queue = mp.get_context("spawn").Queue()
+    for job in jobs:
+        job_queue.put((job.algo, job.cli_args))
+    for _ in range(workers):
+        job_queue.put(None)
+    mp.spawn(_torch_mp_worker, args=(job_queue,), nprocs=workers, join=True)
+
+
 if __name__ == "__main__":
     args = parse_args()
 
-    commands = []
+    # catch a typo'd algo once here instead of letting every (task, seed)
+    # job pay python startup just to fail on the missing script
+    missing = [algo for algo in args.algo if not os.path.isfile(f"{algo}.py")]
+    assert not missing, f"no script found for algorithms: {missing}"
+
+    jobs = []
     for seed in range(0, args.num_seeds):
         for task in args.tasks:
             if "Doggo" in task:
@@ -89,14 +250,17 @@ if __name__ == "__main__":
                 args.steps_per_epoch = str(200000)
                 args.num_envs = str(20)
             for algo in args.algo:
-                commands += [
-                    " ".join(
+                seed_value = args.start_seed + 1000*seed
+                jobs.append(
+                    Job(
+                        algo,
+                        task,
+                        seed_value,
                         [
-                            f"python {algo}.py",
                             "--task",
                             task,
                             "--seed",
-                            str(args.start_seed + 1000*seed),
+                            str(seed_value),
                             "--write-terminal",
                             "False",
                             "--experiment",
@@ -107,25 +271,26 @@ if __name__ == "__main__":
                             str(args.num_envs),
                             "--steps-per-epoch",
                             str(args.steps_per_epoch),
-                        ]
+                        ],
                     )
-                ]
+                )
 
+    for job in jobs:
+        if not is_supported(job):
+            print(f"skipping unsupported combination: {job.algo} on {job.task}")
+    jobs = [job for job in jobs if is_supported(job)]
 
     print("======= commands to run:")
-    for command in commands:
-        print(command)
-
-    if args.workers > 0:
-        from concurrent.futures import ThreadPoolExecutor
+    for job in jobs:
+        print(shlex.join(job_command(job)))
 
-        executor = ThreadPoolExecutor(
-            max_workers=args.workers, thread_name_prefix="safepo-benchmark-worker-"
-        )
-        for command in commands:
-            executor.submit(run_experiment, command)
-        executor.shutdown(wait=True)
-    else:
+    if args.workers <= 0:
         print(
             "not running the experiments because --workers is set to 0; just printing the commands to run"
         )
+    elif args.backend == "pool":
+        run_pooled_experiments(jobs, args.workers)
+    elif args.backend == "torch-mp":
+        run_torch_mp_experiments(jobs, args.workers)
+    else:
+        asyncio.run(run_all_experiments(jobs, args.workers, args.log_dir))
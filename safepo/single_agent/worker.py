@@ -0,0 +1,71 @@
+# Copyright 2023 OmniSafeAI Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Persistent worker for the single-agent benchmark driver.
+
+Launching a fresh ``python {algo}.py`` subprocess for every (task, seed)
+pair pays the full interpreter plus torch/numpy import cost on each run.
+This module instead lets a pool worker import the algorithm module once
+(via :func:`load_algo`) and then execute many jobs in-process through
+:func:`run`, amortizing the startup cost across the whole sweep.
+"""
+
+import importlib
+import os
+import sys
+import time
+
+_ALGO_MODULE = None
+
+
+def load_algo(algo):
+    """Pool initializer: import the algorithm module once per worker."""
+    global _ALGO_MODULE
+    _ALGO_MODULE = importlib.import_module(algo)
+
+
+def run(cli_args):
+    """Run one benchmark job in-process.
+
+    ``cli_args`` is the argv tail that the subprocess backend would have
+    passed to ``python {algo}.py``.
+    """
+    from safepo.utils.config import single_agent_args
+
+    algo = _ALGO_MODULE.__name__
+    sys.argv = [f"{algo}.py", *cli_args]
+    args, cfg_env = single_agent_args()
+    relpath = time.strftime("%Y-%m-%d-%H-%M-%S")
+    subfolder = "-".join(["seed", str(args.seed).zfill(3)])
+    relpath = "-".join([subfolder, relpath])
+    args.log_dir = os.path.join(args.log_dir, args.experiment, args.task, algo, relpath)
+    if not args.write_terminal:
+        terminal_log_name = f"seed{args.seed}_terminal.log"
+        error_log_name = f"seed{args.seed}_error.log"
+        if not os.path.exists(args.log_dir):
+            os.makedirs(args.log_dir, exist_ok=True)
+        stdout, stderr = sys.stdout, sys.stderr
+        with open(
+            os.path.join(args.log_dir, terminal_log_name), "w", encoding="utf-8"
+        ) as f_out, open(
+            os.path.join(args.log_dir, error_log_name), "w", encoding="utf-8"
+        ) as f_error:
+            sys.stdout, sys.stderr = f_out, f_error
+            try:
+                _ALGO_MODULE.main(args, cfg_env)
+            finally:
+                sys.stdout, sys.stderr = stdout, stderr
+    else:
+        _ALGO_MODULE.main(args, cfg_env)
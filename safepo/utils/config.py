@@ -18,13 +18,17 @@ import os
 import random
 from distutils.util import strtobool
 
-import numpy as np
 import copy
-import torch
+import functools
 import time
-import yaml
+import types
 import argparse
 
+# numpy, torch and yaml are imported lazily inside the functions that need
+# them: torch alone costs up to a second of import time, and the benchmark
+# drivers spawn hundreds of processes that only need the task maps or
+# argument parsing from this module.
+
 
 multi_agent_velocity_map = {
     'Safety2x4AntVelocity-v0': {
@@ -79,7 +83,29 @@ isaac_gym_map = {
     "FreightFrankaPickAndPlace": "freight_franka_pick_and_place",
 }
 
+_CFG_CACHE = {}
+
+def _load_yaml_cfg(path):
+    """Parse a yaml config once per (path, mtime) and return a deep copy.
+
+    Cached entries are wrapped in a read-only mapping so nothing can
+    mutate them behind the cache's back; callers always get their own
+    deep copy to play with.
+    """
+    import yaml
+
+    key = (path, os.path.getmtime(path))
+    if key not in _CFG_CACHE:
+        with open(path, 'r') as f:
+            raw = yaml.load(
+                f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+            )
+        _CFG_CACHE[key] = types.MappingProxyType(raw)
+    return copy.deepcopy(dict(_CFG_CACHE[key]))
+
 def set_np_formatting():
+    import numpy as np
+
     np.set_printoptions(edgeitems=30, infstr='inf',
                         linewidth=4000, nanstr='nan', precision=2,
                         suppress=False, threshold=10000, formatter=None)
@@ -89,26 +115,47 @@ def warn_task_name():
         "Unrecognized task!")
 
 def set_seed(seed, torch_deterministic=False):
-    
+    import numpy as np
+    import torch
+
     random.seed(seed)
     np.random.seed(seed)
     torch.manual_seed(seed)
-    os.environ['PYTHONHASHSEED'] = str(seed)
-    torch.cuda.manual_seed(seed)
-    torch.cuda.manual_seed_all(seed)
-    torch.autograd.set_detect_anomaly(True)
-    
-    torch.backends.cudnn.benchmark = True
+    # Note: PYTHONHASHSEED is frozen at interpreter start, so setting it
+    # here would do nothing; the benchmark driver exports it to each child
+    # process instead.
+    # manual_seed_all already covers every visible device; skip it entirely
+    # on CPU-only runs so seeding doesn't spin up a CUDA context.
+    if torch.cuda.is_available():
+        torch.cuda.manual_seed_all(seed)
+    if os.environ.get("SAFEPO_ANOMALY"):
+        torch.autograd.set_detect_anomaly(True)
+
+    # cudnn.benchmark only pays off when input shapes are fixed; with
+    # varying shapes it re-runs the algorithm search on every new shape,
+    # so it is opt-in via SAFEPO_CUDNN_BENCHMARK=1.
+    torch.backends.cudnn.benchmark = bool(
+        int(os.environ.get("SAFEPO_CUDNN_BENCHMARK", "0"))
+    )
     torch.backends.cudnn.deterministic = False
 
     return seed
 
-def parse_sim_params(args, cfg, cfg_train):
-    # initialize sim
+@functools.lru_cache(maxsize=1)
+def _isaac():
     try:
         from isaacgym import gymapi, gymutil
     except ImportError:
         raise Exception("Please install isaacgym to run Isaac Gym tasks!")
+    return gymapi, gymutil
+
+def parse_sim_params(args, cfg, cfg_train):
+    # mujoco-only runs never set a physics engine; bail out before the
+    # (very heavy) isaacgym import is even attempted
+    if not getattr(args, "physics_engine", None):
+        return None
+    # initialize sim
+    gymapi, gymutil = _isaac()
     sim_params = gymapi.SimParams()
     sim_params.dt = 1./60.
     sim_params.num_client_threads = args.slices
@@ -141,29 +188,34 @@ def parse_sim_params(args, cfg, cfg_train):
 
     return sim_params
 
+# Parameter templates are immutable module-level tuples; argument parsing
+# materializes cheap shallow dict copies instead of deep-copying the whole
+# list (copy.deepcopy chokes on the lambda values) on every call.
+_SINGLE_AGENT_PARAMS = (
+    {"name": "--seed", "type": int, "default":0, "help": "Random seed"},
+    {"name": "--use-eval", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Use evaluation environment for testing"},
+    {"name": "--task", "type": str, "default": "SafetyPointGoal1-v0", "help": "The task to run"},
+    {"name": "--num-envs", "type": int, "default": 10, "help": "The number of parallel game environments"},
+    {"name": "--experiment", "type": str, "default": "single_agent_exp", "help": "Experiment name"},
+    {"name": "--log-dir", "type": str, "default": "../runs", "help": "directory to save agent logs"},
+    {"name": "--device", "type": str, "default": "cpu", "help": "The device to run the model on"},
+    {"name": "--device-id", "type": int, "default": 0, "help": "The device id to run the model on"},
+    {"name": "--write-terminal", "type": lambda x: bool(strtobool(x)), "default": True, "help": "Toggles terminal logging"},
+    {"name": "--headless", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Toggles headless mode"},
+    {"name": "--total-steps", "type": int, "default": 10000000, "help": "Total timesteps of the experiments"},
+    {"name": "--steps-per-epoch", "type": int, "default": 20000, "help": "The number of steps to run in each environment per policy rollout"},
+    {"name": "--randomize", "type": bool, "default": False, "help": "Wheather to randomize the environments' initial states"},
+    {"name": "--cost-limit", "type": float, "default": 25.0, "help": "cost_lim"},
+    {"name": "--lagrangian-multiplier-init", "type": float, "default": 0.001, "help": "initial value of lagrangian multiplier"},
+    {"name": "--lagrangian-multiplier-lr", "type": float, "default": 0.035, "help": "learning rate of lagrangian multiplier"},
+)
+
 def single_agent_args():
-    custom_parameters = [
-        {"name": "--seed", "type": int, "default":0, "help": "Random seed"},
-        {"name": "--use-eval", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Use evaluation environment for testing"},
-        {"name": "--task", "type": str, "default": "SafetyPointGoal1-v0", "help": "The task to run"},
-        {"name": "--num-envs", "type": int, "default": 10, "help": "The number of parallel game environments"},
-        {"name": "--experiment", "type": str, "default": "single_agent_exp", "help": "Experiment name"},
-        {"name": "--log-dir", "type": str, "default": "../runs", "help": "directory to save agent logs"},
-        {"name": "--device", "type": str, "default": "cpu", "help": "The device to run the model on"},
-        {"name": "--device-id", "type": int, "default": 0, "help": "The device id to run the model on"},
-        {"name": "--write-terminal", "type": lambda x: bool(strtobool(x)), "default": True, "help": "Toggles terminal logging"},
-        {"name": "--headless", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Toggles headless mode"},
-        {"name": "--total-steps", "type": int, "default": 10000000, "help": "Total timesteps of the experiments"},
-        {"name": "--steps-per-epoch", "type": int, "default": 20000, "help": "The number of steps to run in each environment per policy rollout"},
-        {"name": "--randomize", "type": bool, "default": False, "help": "Wheather to randomize the environments' initial states"},
-        {"name": "--cost-limit", "type": float, "default": 25.0, "help": "cost_lim"},
-        {"name": "--lagrangian-multiplier-init", "type": float, "default": 0.001, "help": "initial value of lagrangian multiplier"},
-        {"name": "--lagrangian-multiplier-lr", "type": float, "default": 0.035, "help": "learning rate of lagrangian multiplier"},
-    ]
     # Create argument parser
     parser = argparse.ArgumentParser(description="RL Policy")
-    issac_parameters = copy.deepcopy(custom_parameters)
-    for param in custom_parameters:
+    issac_parameters = [dict(param) for param in _SINGLE_AGENT_PARAMS]
+    for param in _SINGLE_AGENT_PARAMS:
+        param = dict(param)
         param_name = param.pop("name")
         parser.add_argument(param_name, **param)
 
@@ -180,41 +232,40 @@ def single_agent_args():
         args = gymutil.parse_arguments(description="RL Policy", custom_parameters=issac_parameters)
         args.device = args.sim_device_type if args.use_gpu_pipeline else 'cpu'
         cfg_env_path = "marl_cfg/{}.yaml".format(isaac_gym_map[args.task])
-        with open(os.path.join(base_path, cfg_env_path), 'r') as f:
-            cfg_env = yaml.load(f, Loader=yaml.SafeLoader)
-            cfg_env["name"] = args.task
-            if "task" in cfg_env:
-                if "randomize" not in cfg_env["task"]:
-                    cfg_env["task"]["randomize"] = args.randomize
-                else:
-                    cfg_env["task"]["randomize"] = False
+        cfg_env = _load_yaml_cfg(os.path.join(base_path, cfg_env_path))
+        cfg_env["name"] = args.task
+        if "task" in cfg_env:
+            if "randomize" not in cfg_env["task"]:
+                cfg_env["task"]["randomize"] = args.randomize
+            else:
+                cfg_env["task"]["randomize"] = False
     return args, cfg_env
 
 
-def multi_agent_args(algo):
+_MULTI_AGENT_PARAMS = (
+    {"name": "--use-eval", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Use evaluation environment for testing"},
+    {"name": "--task", "type": str, "default": "Safety2x4AntVelocity-v0", "help": "The task to run"},
+    {"name": "--agent-conf", "type": str, "default": "2x4", "help": "The agent configuration"},
+    {"name": "--scenario", "type": str, "default": "Ant", "help": "The scenario"},
+    {"name": "--experiment", "type": str, "default": "Base", "help": "Experiment name"},
+    {"name": "--seed", "type": int, "default":0, "help": "Random seed"},
+    {"name": "--model-dir", "type": str, "default": "", "help": "Choose a model dir"},
+    {"name": "--cost-limit", "type": float, "default": 25.0, "help": "cost_lim"},
+    {"name": "--device", "type": str, "default": "cpu", "help": "The device to run the model on"},
+    {"name": "--device-id", "type": int, "default": 0, "help": "The device id to run the model on"},
+    {"name": "--write-terminal", "type": lambda x: bool(strtobool(x)), "default": True, "help": "Toggles terminal logging"},
+    {"name": "--headless", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Toggles headless mode"},
+    {"name": "--total-steps", "type": int, "default": None, "help": "Total timesteps of the experiments"},
+    {"name": "--num-envs", "type": int, "default": None, "help": "The number of parallel game environments"},
+    {"name": "--randomize", "type": bool, "default": False, "help": "Wheather to randomize the environments' initial states"},
+)
 
-    # Define custom parameters
-    custom_parameters = [
-        {"name": "--use-eval", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Use evaluation environment for testing"},
-        {"name": "--task", "type": str, "default": "Safety2x4AntVelocity-v0", "help": "The task to run"},
-        {"name": "--agent-conf", "type": str, "default": "2x4", "help": "The agent configuration"},
-        {"name": "--scenario", "type": str, "default": "Ant", "help": "The scenario"},
-        {"name": "--experiment", "type": str, "default": "Base", "help": "Experiment name"},
-        {"name": "--seed", "type": int, "default":0, "help": "Random seed"},
-        {"name": "--model-dir", "type": str, "default": "", "help": "Choose a model dir"},
-        {"name": "--cost-limit", "type": float, "default": 25.0, "help": "cost_lim"},
-        {"name": "--device", "type": str, "default": "cpu", "help": "The device to run the model on"},
-        {"name": "--device-id", "type": int, "default": 0, "help": "The device id to run the model on"},
-        {"name": "--write-terminal", "type": lambda x: bool(strtobool(x)), "default": True, "help": "Toggles terminal logging"},
-        {"name": "--headless", "type": lambda x: bool(strtobool(x)), "default": False, "help": "Toggles headless mode"},
-        {"name": "--total-steps", "type": int, "default": None, "help": "Total timesteps of the experiments"},
-        {"name": "--num-envs", "type": int, "default": None, "help": "The number of parallel game environments"},
-        {"name": "--randomize", "type": bool, "default": False, "help": "Wheather to randomize the environments' initial states"},
-    ]
+def multi_agent_args(algo):
     # Create argument parser
     parser = argparse.ArgumentParser(description="RL Policy")
-    issac_parameters = copy.deepcopy(custom_parameters)
-    for param in custom_parameters:
+    issac_parameters = [dict(param) for param in _MULTI_AGENT_PARAMS]
+    for param in _MULTI_AGENT_PARAMS:
+        param = dict(param)
         param_name = param.pop("name")
         parser.add_argument(param_name, **param)
 
@@ -231,14 +282,13 @@ def multi_agent_args(algo):
         args.device = args.sim_device_type if args.use_gpu_pipeline else 'cpu'
     cfg_train_path = "marl_cfg/{}/config.yaml".format(algo)
     base_path = os.path.dirname(os.path.abspath(__file__)).replace("utils", "multi_agent")
-    with open(os.path.join(base_path, cfg_train_path), 'r') as f:
-        cfg_train = yaml.load(f, Loader=yaml.SafeLoader)
-        if args.task in multi_agent_velocity_map.keys():
-            cfg_train.update(cfg_train.get("mamujoco"))
-            args.agent_conf = multi_agent_velocity_map[args.task]["agent_conf"]
-            args.scenario = multi_agent_velocity_map[args.task]["scenario"]
-        elif args.task in multi_agent_goal_tasks:
-            cfg_train.update(cfg_train.get("mamujoco"))
+    cfg_train = _load_yaml_cfg(os.path.join(base_path, cfg_train_path))
+    if args.task in multi_agent_velocity_map.keys():
+        cfg_train.update(cfg_train.get("mamujoco"))
+        args.agent_conf = multi_agent_velocity_map[args.task]["agent_conf"]
+        args.scenario = multi_agent_velocity_map[args.task]["scenario"]
+    elif args.task in multi_agent_goal_tasks:
+        cfg_train.update(cfg_train.get("mamujoco"))
 
     cfg_train["use_eval"] = args.use_eval
     cfg_train["cost_limit"]=args.cost_limit
@@ -252,23 +302,23 @@ def multi_agent_args(algo):
     if args.num_envs:
         cfg_train["n_rollout_threads"] = args.num_envs
         cfg_train["n_eval_rollout_threads"] = args.num_envs
-    relpath = time.strftime("%Y-%m-%d-%H-%M-%S")
-    subfolder = "-".join(["seed", str(args.seed).zfill(3)])
-    relpath = "-".join([subfolder, relpath])
-    cfg_train['log_dir']="../runs/"+args.experiment+'/'+args.task+'/'+algo+'/'+relpath
+    timestamp = time.strftime("%Y-%m-%d-%H-%M-%S")
+    relpath = f"seed-{args.seed:03d}-{timestamp}"
+    cfg_train['log_dir'] = os.path.join(
+        "..", "runs", args.experiment, args.task, algo, relpath
+    )
     cfg_env={}
     if args.task in isaac_gym_map.keys():
         cfg_env_path = "marl_cfg/{}.yaml".format(isaac_gym_map[args.task])
-        with open(os.path.join(base_path, cfg_env_path), 'r') as f:
-            cfg_env = yaml.load(f, Loader=yaml.SafeLoader)
-            cfg_env["name"] = args.task
-            if "task" in cfg_env:
-                if "randomize" not in cfg_env["task"]:
-                    cfg_env["task"]["randomize"] = args.randomize
-                else:
-                    cfg_env["task"]["randomize"] = False
+        cfg_env = _load_yaml_cfg(os.path.join(base_path, cfg_env_path))
+        cfg_env["name"] = args.task
+        if "task" in cfg_env:
+            if "randomize" not in cfg_env["task"]:
+                cfg_env["task"]["randomize"] = args.randomize
             else:
-                cfg_env["task"] = {"randomize": False}
+                cfg_env["task"]["randomize"] = False
+        else:
+            cfg_env["task"] = {"randomize": False}
     elif args.task in multi_agent_velocity_map.keys() or args.task in multi_agent_goal_tasks:
         pass
     else: